@@ -1,12 +1,27 @@
 #!/usr/bin/env python3
 import os
 import sys
+import argparse
+import graphlib
 import json
+import functools
+import glob
+import hashlib
+import http.client
 import subprocess
 import pwd
+import re
 import shutil
+import ssl
+import stat
 import tarfile
-from datetime import datetime
+import pathlib
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 RED = "\033[0;31m"
 NC = "\033[0m"
@@ -14,19 +29,73 @@ NC = "\033[0m"
 # Base packages that are *not* guaranteed to be present on Debian 13 KDE Plasma
 # but are required for this script / intended UX.
 BASE_DEPENDENCIES = [
-    "curl",
-    "wget",
-    "tar",
     "flatpak",
     "plasma-discover-backend-flatpak",
 ]
+# APT packages needed by the individual menu options; these are queued up
+# front so every selected option is served by one apt transaction.
+PLASMOID_APT_DEPS = ["git", "kpackagetool6"]
+KITTY_APT_DEPS = ["kitty"]
+MATERIAL_YOU_APT_DEPS = [
+    "pipx",
+    "build-essential",
+    "python3-dev",
+    "pkg-config",
+    "python-dbus-dev",
+    "libglib2.0-dev",
+    "qml6-module-qt-labs-settings",
+]
+# Copy cached theme files instead of symlinking them (see --copy-mode)
+COPY_MODE = False
+# Skip 'apt-get update' when the package lists are younger than this
+APT_LISTS_TTL = 60 * 60
+# Set once the apt lists are known fresh (or refreshed) for this run
+_APT_LISTS_FRESH = False
+# Packages queued via queue_apt() and not yet installed by flush_apt()
+PENDING_APT: set[str] = set()
 LATEST_TAG_VERSION: str | None = None
 RELEASE_LINK: str | None = None
 TAG_PATH: str | None = None
 PLASMOID_ID = "luisbocanegra.kde-material-you-colors"
 REPO_URL = "https://github.com/luisbocanegra/kde-material-you-colors.git"
+# Nyarch "suggested" apps, installed from Flathub in one transaction
+FLATHUB_APPS = [
+    "org.gtk.Gtk3theme.adw-gtk3",
+    "org.gtk.Gtk3theme.adw-gtk3-dark",
+    "info.febvre.Komikku",
+    "com.github.tchx84.Flatseal",
+    "de.haeckerfelix.Shortwave",
+    "org.gnome.Lollypop",
+    "de.haeckerfelix.Fragments",
+    "com.mattjakeman.ExtensionManager",
+    "it.mijorus.gearlever",
+]
+# Non-interactive, idempotent install: re-runs update in place, never prompt
+FLATPAK_INSTALL = ["flatpak", "install", "-y", "--noninteractive", "--or-update"]
+# Upper bound on concurrent downloads so we don't saturate the user's link
+MAX_PARALLEL_DOWNLOADS = 4
+# Read size for the streamed (r|gz) archive, i.e. how much compressed data
+# is pulled per read (tarfile default: RECORDSIZE, 10 KiB). Per-member
+# copies into the extracted files still use copyfileobj's own buffer.
+TAR_BUFSIZE = 2 * 1024 * 1024
+USER_AGENT = "nyarch-installer"
+# Parallel connections per download when aria2c is available
+ARIA2C_CONNECTIONS = 8
+LATEST_RELEASE_API = (
+    "https://api.github.com/repos/NyarchLinux/NyarchLinux/releases/latest"
+)
+BANNER_URL = (
+    "https://raw.githubusercontent.com/NyarchLinux/NyarchLinux/main/"
+    "Gnome/etc/skel/.config/neofetch/ascii70"
+)
+BANNER_TTL = 7 * 24 * 60 * 60
+# Printed when the banner has never been fetched and the network is down
+FALLBACK_BANNER = "\n  Nyarch Linux  =^..^=\n"
+# How long a cached latest-tag lookup is trusted without asking GitHub again
+TAG_CACHE_TTL = 6 * 60 * 60
 
 # ───────────────────────── basics / env ─────────────────────────
+@functools.lru_cache(maxsize=1)
 def _get_real_home() -> str:
     """Return the 'real' home dir (sudo caller if present, else current)."""
     sudo_user = os.environ.get("SUDO_USER")
@@ -39,37 +108,102 @@ def _get_real_home() -> str:
 
 
 REAL_HOME = _get_real_home()
-os.environ["HOME"] = REAL_HOME  # make shell commands respect the sudo user's home
-
-# Per-user cache root for all downloads/extractions
-CACHE_ROOT = os.path.join(REAL_HOME, ".cache", "nyarch-kde")
+# Make shell commands respect the sudo user's home. Child processes inherit
+# os.environ, so helpers below don't need to build their own env copy.
+os.environ["HOME"] = REAL_HOME
+# Resolved once; every per-user install path below hangs off these
+LOCAL_SHARE = os.path.join(REAL_HOME, ".local", "share")
+CONFIG_DIR = os.path.join(REAL_HOME, ".config")
+
+# Per-user cache root for all downloads/extractions. Honour XDG_CACHE_HOME,
+# except under sudo where it would belong to root rather than the real user.
+_XDG_CACHE_HOME = None if os.environ.get("SUDO_USER") else os.environ.get("XDG_CACHE_HOME")
+CACHE_ROOT = os.path.join(
+    _XDG_CACHE_HOME or os.path.join(REAL_HOME, ".cache"), "nyarch-kde"
+)
 os.makedirs(CACHE_ROOT, exist_ok=True)
 
 
-def sh(cmd: str, cwd: str | None = None) -> int:
+def run(args: list[str], cwd: str | None = None) -> int:
     """
-    Run a shell command without exiting on failure, return exit code.
+    Run a command without exiting on failure, return exit code.
 
-    Only use this for *static* commands that do not include data from
-    remote sources or user input.
+    Argument list only, never a shell, so paths and data derived from remote
+    resources (e.g. URLs containing GitHub tag names) need no quoting.
     """
-    env = os.environ.copy()
-    env["HOME"] = REAL_HOME
-    result = subprocess.run(cmd, shell=True, cwd=cwd, env=env)
+    result = subprocess.run(args, cwd=cwd)
     return result.returncode
 
 
-def run(args: list[str], cwd: str | None = None) -> int:
+@functools.lru_cache(maxsize=1)
+def _ssl_context() -> ssl.SSLContext:
+    """Shared TLS context, so the CA store is loaded once per run."""
+    return ssl.create_default_context()
+
+
+def _urlopen(url: str, headers: dict[str, str] | None = None, timeout: float = 30):
+    """
+    In-process HTTP(S) GET via urllib with our User-Agent and the shared TLS
+    context. Raises urllib.error.URLError / OSError on failure.
+    """
+    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, **(headers or {})})
+    return urllib.request.urlopen(req, timeout=timeout, context=_ssl_context())
+
+
+def _check_content_length(resp, received: int) -> None:
+    """Raise IncompleteRead if received doesn't match resp's Content-Length."""
+    expected = resp.headers.get("Content-Length")
+    if expected is not None and expected.isdigit() and int(expected) != received:
+        raise http.client.IncompleteRead(b"", int(expected) - received)
+
+
+class _CountingReader:
+    """File-like wrapper around an HTTP response that counts bytes read."""
+
+    def __init__(self, resp) -> None:
+        self.resp = resp
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.resp.read(size)
+        self.count += len(data)
+        return data
+
+
+def http_download(url: str, target: str) -> bool:
     """
-    Safer subprocess helper: no shell, argument list only.
+    Stream url into target in 1 MiB chunks. Returns True on success; on
+    failure prints the error and removes any partial target.
 
-    Use this whenever the command includes data derived from remote
-    resources (e.g. URLs containing GitHub tag names).
+    A body shorter than its Content-Length counts as a failure: read()
+    simply returns b"" when the server closes early.
     """
-    env = os.environ.copy()
-    env["HOME"] = REAL_HOME
-    result = subprocess.run(args, cwd=cwd, env=env)
-    return result.returncode
+    try:
+        with _urlopen(url, timeout=60) as resp, open(target, "wb") as f:
+            written = 0
+            while chunk := resp.read(1024 * 1024):
+                f.write(chunk)
+                written += len(chunk)
+            _check_content_length(resp, written)
+        return True
+    except (OSError, http.client.HTTPException) as exc:
+        print(f"Download of {url} failed: {exc}")
+        try:
+            os.remove(target)
+        except OSError:
+            pass
+        return False
+
+
+def download_parallel(items: list[tuple[str, str]]) -> list[bool]:
+    """
+    Download (url, target) pairs concurrently, at most MAX_PARALLEL_DOWNLOADS
+    at once. Returns per-item success in the same order.
+    """
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_DOWNLOADS) as ex:
+        return list(ex.map(lambda item: http_download(*item), items))
 
 
 def _ensure_cache_subdir(name: str) -> str:
@@ -81,38 +215,339 @@ def _ensure_cache_subdir(name: str) -> str:
     return cache_dir
 
 
+def _apt_lists_fresh(ttl: int = APT_LISTS_TTL) -> bool:
+    """Return True if the newest apt Release file is younger than ttl seconds."""
+    try:
+        newest = max(
+            os.stat(p).st_mtime for p in glob.glob("/var/lib/apt/lists/*Release")
+        )
+    except (ValueError, OSError):
+        return False
+    return time.time() - newest < ttl
+
+
 def apt_install(packages: list[str]) -> int:
     """
     Install the given APT packages non-interactively (-y).
-    Returns the shell command exit code.
+    Returns the apt-get exit code.
+
+    'apt-get update' only runs if the package lists are stale, and at most
+    once per run.
     """
-    if not packages:
+    global _APT_LISTS_FRESH
+
+    pkgs = sorted(set(packages))
+    if not pkgs:
         return 0
-    pkg_str = " ".join(sorted(set(packages)))
-    cmd = (
-        "sudo apt-get update -qq && "
-        f"sudo apt-get install -y {pkg_str}"
+    # sudo resets the environment, so pass DEBIAN_FRONTEND through env(1)
+    apt_get = ["sudo", "env", "DEBIAN_FRONTEND=noninteractive", "apt-get"]
+    if not (_APT_LISTS_FRESH or _apt_lists_fresh()):
+        rc = run([*apt_get, "update", "-qq"])
+        if rc != 0:
+            return rc
+    _APT_LISTS_FRESH = True
+    return run([*apt_get, "install", "-y", *pkgs])
+
+
+def _missing_apt_packages(packages: list[str]) -> list[str]:
+    """
+    Return the subset of packages that dpkg does not report as installed.
+
+    Uses a single dpkg-query call for the whole batch.
+    """
+    if not packages:
+        return []
+    result = subprocess.run(
+        ["dpkg-query", "-W", "-f=${Package} ${Status}\n", *packages],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
     )
-    return sh(cmd)
+    installed = {
+        line.split(" ", 1)[0].split(":", 1)[0]
+        for line in result.stdout.splitlines()
+        if line.endswith(" install ok installed")
+    }
+    return [p for p in packages if p not in installed]
+
+
+def queue_apt(packages: list[str]) -> None:
+    """Queue APT packages for the next flush_apt() transaction."""
+    PENDING_APT.update(packages)
+
+
+def flush_apt() -> int:
+    """
+    Install everything queued via queue_apt() in one apt transaction,
+    skipping packages that are already installed. Returns the exit code.
+    """
+    missing = _missing_apt_packages(sorted(PENDING_APT))
+    PENDING_APT.clear()
+    if not missing:
+        return 0
+    print("Installing packages with apt:\n  " + " ".join(missing))
+    return apt_install(missing)
+
+
+def ensure_apt(packages: list[str]) -> int:
+    """
+    Make sure packages are installed; a no-op (no apt-get update) when an
+    earlier batched flush already installed them.
+    """
+    queue_apt(packages)
+    return flush_apt()
+
+
+def _copy_fd_data(src_fd: int, dst_fd: int, size: int) -> None:
+    """
+    Copy size bytes from src_fd to dst_fd without a userspace buffer where
+    possible: os.copy_file_range (can reflink on btrfs/XFS), then
+    os.sendfile, then a plain read/write loop.
+    """
+    copied = 0
+    try:
+        while copied < size:
+            n = os.copy_file_range(src_fd, dst_fd, size - copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError:
+        if copied:
+            raise
+    else:
+        # Some filesystems report "unsupported" by copying 0 bytes at
+        # offset 0 instead of failing; fall back then, like shutil does
+        if copied or not size:
+            return
+
+    try:
+        while copied < size:
+            n = os.sendfile(dst_fd, src_fd, copied, size - copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError:
+        if copied:
+            raise
+    else:
+        if copied or not size:
+            return
+
+    while chunk := os.read(src_fd, 1024 * 1024):
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(dst_fd, view):]
+
+
+def _copy_file(
+    src: str,
+    dest: str,
+    src_dir_fd: int | None = None,
+    dest_dir_fd: int | None = None,
+) -> bool:
+    """
+    Copy one regular file and apply its mode and timestamps like shutil.copy2.
+
+    src/dest may be relative to open directory fds (as yielded by os.fwalk),
+    which avoids re-resolving the full path for every file. Works on raw fds
+    throughout. Returns False if src is missing (e.g. a broken symlink) or
+    not a regular file; raises shutil.SameFileError if dest already is src
+    (O_TRUNC would otherwise empty it).
+    """
+    try:
+        src_fd = os.open(
+            src, os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC, dir_fd=src_dir_fd
+        )
+    except FileNotFoundError:
+        return False
+    try:
+        st = os.fstat(src_fd)
+        if not stat.S_ISREG(st.st_mode):
+            return False
+        try:
+            dest_st = os.stat(dest, dir_fd=dest_dir_fd)
+        except FileNotFoundError:
+            pass
+        else:
+            if os.path.samestat(st, dest_st):
+                raise shutil.SameFileError(f"{src!r} and {dest!r} are the same file")
+        dst_fd = os.open(
+            dest,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC,
+            0o600,
+            dir_fd=dest_dir_fd,
+        )
+        try:
+            _copy_fd_data(src_fd, dst_fd, st.st_size)
+            os.fchmod(dst_fd, stat.S_IMODE(st.st_mode))
+            os.utime(dst_fd, ns=(st.st_atime_ns, st.st_mtime_ns))
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    return True
+
+
+def _copy_pool() -> ThreadPoolExecutor:
+    """
+    Thread pool for file copies; the copy syscalls release the GIL, so
+    several copies can be in flight at once.
+    """
+    return ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+
+
+def _copy_files_parallel(jobs: list[tuple[str, str]]) -> int:
+    """
+    Copy (src, dest) path pairs on a thread pool, skipping sources that are
+    missing. Returns the number of files copied.
+    """
+    if not jobs:
+        return 0
+    with _copy_pool() as ex:
+        return sum(ex.map(lambda job: _copy_file(*job), jobs))
 
 
 def copy_tree_skip_missing(src_dir: str, dest_dir: str) -> None:
     """
     Recursively copy src_dir → dest_dir, creating directories as needed and
     skipping any missing/broken files instead of erroring out.
+
+    Walks with os.fwalk and opens files relative to the directory fds, so
+    each path is resolved once per directory rather than once per file.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    dest_top_fd = os.open(dest_dir, os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+    try:
+        with _copy_pool() as ex:
+            # Like os.walk, fwalk doesn't descend into symlinked directories
+            for root, _dirs, files, root_fd in os.fwalk(src_dir):
+                rel_root = os.path.relpath(root, src_dir)
+                if rel_root != ".":
+                    try:
+                        os.mkdir(rel_root, dir_fd=dest_top_fd)
+                    except FileExistsError:
+                        pass
+                dest_fd = os.open(
+                    rel_root,
+                    os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC,
+                    dir_fd=dest_top_fd,
+                )
+                try:
+                    # Drain this directory's copies before fwalk closes root_fd
+                    list(
+                        ex.map(
+                            lambda name: _copy_file(name, name, root_fd, dest_fd),
+                            files,
+                        )
+                    )
+                finally:
+                    os.close(dest_fd)
+    finally:
+        os.close(dest_top_fd)
+
+
+def _download_sidecar(url: str) -> str:
+    """Path of the file recording which release tag url was last fetched for."""
+    digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    return os.path.join(_ensure_cache_subdir("downloads"), digest)
+
+
+def download_cached(items: list[tuple[str, str]]) -> list[bool]:
+    """
+    Download (url, target) pairs into the cache, skipping any whose target
+    already exists and was fetched for the current LATEST_TAG_VERSION.
+
+    Release URLs are pinned to a tag, so a matching sidecar means the file
+    can't have changed. Missing files are downloaded concurrently to
+    <target>.part and renamed into place, so a target is never left
+    half-written (and never rewritten in place, which matters for targets
+    that are hardlinked elsewhere). Returns per-item success.
     """
-    for root, dirs, files in os.walk(src_dir):
-        rel_root = os.path.relpath(root, src_dir)
-        dest_root = dest_dir if rel_root == "." else os.path.join(dest_dir, rel_root)
+    tag = LATEST_TAG_VERSION or ""
+    todo: list[tuple[str, str]] = []
+    for url, target in items:
+        try:
+            with open(_download_sidecar(url), "r", encoding="utf-8") as f:
+                fresh = f.read().strip() == tag
+        except OSError:
+            fresh = False
+        if not (fresh and tag and os.path.isfile(target)):
+            todo.append((url, target))
 
-        os.makedirs(dest_root, exist_ok=True)
+    oks = download_parallel([(url, f"{target}.part") for url, target in todo])
+    failed = set()
+    for ok, (url, target) in zip(oks, todo):
+        if not ok:
+            failed.add(target)
+            continue
+        os.replace(f"{target}.part", target)
+        with open(_download_sidecar(url), "w", encoding="utf-8") as f:
+            f.write(tag + "\n")
 
-        for name in files:
-            src_path = os.path.join(root, name)
-            if not os.path.exists(src_path):
-                continue
-            dest_path = os.path.join(dest_root, name)
-            shutil.copy2(src_path, dest_path)
+    return [target not in failed for _, target in items]
+
+
+def _write_json_atomic(path: str, data: dict) -> None:
+    """Write data as JSON to path via a temp file + os.replace."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+# path → ((st_mtime_ns, st_size), text) for _read_text_cached
+_TEXT_CACHE: dict[str, tuple[tuple[int, int], str]] = {}
+
+
+def _read_text_cached(path: str) -> str:
+    """
+    Read a small text file, reusing the previous read while its
+    (mtime_ns, size) is unchanged. Missing files read as "".
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return ""
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _TEXT_CACHE.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    text = pathlib.Path(path).read_text(encoding="utf-8")
+    _TEXT_CACHE[path] = (key, text)
+    return text
+
+
+APPLIED_SNIPPETS_PATH = os.path.join(CACHE_ROOT, "applied-snippets.json")
+
+
+def _load_applied_snippets() -> dict[str, str]:
+    """Load the marker-hash → file registry of snippets we already appended."""
+    try:
+        with open(APPLIED_SNIPPETS_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+APPLIED_SNIPPETS: dict[str, str] = _load_applied_snippets()
+# Phases may run concurrently (see run_phases); serialize registry writes
+_APPLIED_SNIPPETS_LOCK = threading.Lock()
+
+
+def _snippet_key(marker_comment: str) -> str:
+    """Registry key for a snippet: a short hash of its marker comment."""
+    return hashlib.blake2b(marker_comment.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _record_applied_snippet(key: str, file_path: str) -> None:
+    """Remember that the snippet keyed by key lives in file_path, and persist."""
+    with _APPLIED_SNIPPETS_LOCK:
+        APPLIED_SNIPPETS[key] = file_path
+        try:
+            _write_json_atomic(APPLIED_SNIPPETS_PATH, APPLIED_SNIPPETS)
+        except OSError as exc:
+            print(f"Warning: could not update {APPLIED_SNIPPETS_PATH}: {exc}")
 
 
 def _append_shell_snippet_safely(
@@ -136,14 +571,18 @@ def _append_shell_snippet_safely(
 
       and return True.
 
+    Snippets we applied (or found) are recorded in APPLIED_SNIPPETS, so later
+    runs skip re-reading and scanning the file entirely.
+
     Never does sed/replace. Best-effort, conservative behavior.
     """
+    key = _snippet_key(marker_comment)
+    if APPLIED_SNIPPETS.get(key) == file_path and os.path.exists(file_path):
+        print(f"Snippet already present in {file_path}; skipping.")
+        return True
+
     try:
-        if os.path.exists(file_path):
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-        else:
-            content = ""
+        content = _read_text_cached(file_path)
     except OSError as exc:
         print(f"Warning: could not read {file_path}: {exc}")
         return False
@@ -153,6 +592,7 @@ def _append_shell_snippet_safely(
     # Already present?
     if marker_comment in content or snippet_body_stripped in content:
         print(f"Snippet already present in {file_path}; skipping.")
+        _record_applied_snippet(key, file_path)
         return True
 
     # Heuristic conflict detection
@@ -172,11 +612,13 @@ def _append_shell_snippet_safely(
             f.write(marker_comment.rstrip() + "\n")
             f.write(snippet_body.rstrip() + "\n")
         print(f"Appended Nyarch snippet to {file_path}.")
-        return True
     except OSError as exc:
         print(f"Warning: could not update {file_path}: {exc}")
         return False
 
+    _record_applied_snippet(key, file_path)
+    return True
+
 
 def ensure_local_bin_on_path() -> None:
     """
@@ -211,30 +653,72 @@ def ensure_local_bin_on_path() -> None:
 
 
 def get_latest_tag() -> str:
-    """Return the latest NyarchLinux release tag from GitHub (cached)."""
+    """
+    Return the latest NyarchLinux release tag from GitHub (cached).
+
+    The tag and its ETag are persisted in CACHE_ROOT/latest-tag.json. Within
+    TAG_CACHE_TTL the cached tag is used without any network access; after
+    that a conditional request (If-None-Match) is sent, so an unchanged
+    release costs an empty 304 response.
+    """
     global LATEST_TAG_VERSION
 
     if LATEST_TAG_VERSION:
         return LATEST_TAG_VERSION
 
+    cache_path = os.path.join(CACHE_ROOT, "latest-tag.json")
     try:
-        out = subprocess.check_output(
-            [
-                "curl",
-                "-s",
-                "https://api.github.com/repos/NyarchLinux/NyarchLinux/releases/latest",
-            ],
-            text=True,
-        )
-        data = json.loads(out)
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        cached = {}
+    cached_tag = cached.get("tag")
+
+    if cached_tag and time.time() - cached.get("fetched_at", 0) < TAG_CACHE_TTL:
+        LATEST_TAG_VERSION = str(cached_tag)
+        return LATEST_TAG_VERSION
+
+    headers = {"Accept": "application/vnd.github+json"}
+    if cached_tag and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+
+    try:
+        with _urlopen(LATEST_RELEASE_API, headers=headers, timeout=15) as resp:
+            data = json.load(resp)
+            etag = resp.headers.get("ETag")
         tag = data.get("tag_name")
         if not tag:
             raise ValueError("tag_name not found in GitHub API response")
-        LATEST_TAG_VERSION = str(tag)
-        return LATEST_TAG_VERSION
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or not cached_tag:
+            return _latest_tag_fallback(cached_tag, e)
+        tag, etag = cached_tag, cached.get("etag")
     except Exception as e:
-        print(f"Failed to get latest Nyarch tag: {e}")
-        sys.exit(1)
+        return _latest_tag_fallback(cached_tag, e)
+
+    LATEST_TAG_VERSION = str(tag)
+    try:
+        _write_json_atomic(
+            cache_path,
+            {"tag": LATEST_TAG_VERSION, "etag": etag, "fetched_at": time.time()},
+        )
+    except OSError as exc:
+        print(f"Warning: could not update {cache_path}: {exc}")
+    return LATEST_TAG_VERSION
+
+
+def _latest_tag_fallback(cached_tag: str | None, error: Exception) -> str:
+    """
+    Use a stale cached tag when GitHub can't be reached, else exit.
+    """
+    global LATEST_TAG_VERSION
+
+    if cached_tag:
+        print(f"Failed to refresh latest Nyarch tag ({error}); using cached {cached_tag}")
+        LATEST_TAG_VERSION = str(cached_tag)
+        return LATEST_TAG_VERSION
+    print(f"Failed to get latest Nyarch tag: {error}")
+    sys.exit(1)
 
 
 def ensure_release_info() -> None:
@@ -256,57 +740,178 @@ def ensure_release_info() -> None:
         )
 
 
-def get_tarball() -> None:
+def _tarball_sentinel(tag: str) -> str:
+    """Path of the marker file recording that <tag>'s tarball was extracted."""
+    return os.path.join(CACHE_ROOT, f".nyarch-extracted-{tag}")
+
+
+# Set once the tarball is known extracted in this process
+_TARBALL_EXTRACTED = False
+_TARBALL_LOCK = threading.Lock()
+# Set when the quiet prefetch did the extraction, until a loud caller reports it
+_TARBALL_PREFETCHED = False
+# Set when the background prefetch turns out not to be needed
+_PREFETCH_CANCEL = threading.Event()
+
+
+def get_tarball(quiet: bool = False) -> None:
     """
     Download and extract the main NyarchLinux tarball into CACHE_ROOT if not
     already present.
+
+    The archive is streamed straight from the HTTP response into tarfile, so
+    download and extraction overlap and no .tar.gz is written to disk. If
+    aria2c is installed, it is used instead for a segmented (multi-connection)
+    download to a temporary file, which is extracted and removed. A per-tag
+    sentinel file keeps the "already extracted" fast path across runs;
+    within a run, extraction happens at most once.
+
+    With quiet=True (the background prefetch) nothing is printed, aria2c is
+    not used and extraction stops early once _PREFETCH_CANCEL is set; a
+    failed prefetch is simply retried, loudly, by the next caller. A loud
+    caller that finds the prefetch still running says it is waiting, and
+    reports the prefetched result once it is ready.
+    """
+    global _TARBALL_PREFETCHED
+
+    if not _TARBALL_LOCK.acquire(blocking=False):
+        if not quiet:
+            print("Waiting for the Nyarch tarball download to finish...")
+        _TARBALL_LOCK.acquire()
+    try:
+        if not _TARBALL_EXTRACTED:
+            _get_tarball_locked(quiet)
+            _TARBALL_PREFETCHED = quiet and _TARBALL_EXTRACTED
+        elif _TARBALL_PREFETCHED and not quiet:
+            print(f"Nyarch files for {LATEST_TAG_VERSION} ready under {CACHE_ROOT}")
+            _TARBALL_PREFETCHED = False
+    finally:
+        _TARBALL_LOCK.release()
+
+
+def _start_tarball_prefetch() -> None:
+    """
+    Start fetching the tarball in a daemon thread, so the download overlaps
+    with the user reading the menu and with the apt transaction.
     """
+    threading.Thread(
+        target=get_tarball, kwargs={"quiet": True}, daemon=True
+    ).start()
+
+
+def _get_tarball_locked(quiet: bool = False) -> None:
+    """get_tarball() body; caller holds _TARBALL_LOCK."""
+    global _TARBALL_EXTRACTED
+
     ensure_release_info()
 
-    file_path = os.path.join(CACHE_ROOT, "NyarchLinux.tar.gz")
+    tag = LATEST_TAG_VERSION
     url = f"{RELEASE_LINK}NyarchLinux.tar.gz"  # type: ignore[operator]
+    sentinel = _tarball_sentinel(tag)  # type: ignore[arg-type]
+
+    if os.path.exists(sentinel) and any(
+        os.path.isdir(os.path.join(CACHE_ROOT, d))
+        for d in ("NyarchLinuxComp", "NyarchLinux")
+    ):
+        if not quiet:
+            print(f"Using cached Nyarch files for {tag} under {CACHE_ROOT}")
+        _TARBALL_EXTRACTED = True
+        return
 
-    if not os.path.exists(file_path):
-        print(f"Downloading Nyarch tarball from {url}")
-        rc = run(["wget", "-q", "-O", file_path, url])
-        if rc != 0:
-            print("Failed to download Nyarch tarball; check your network and try again.")
-            return
+    if not quiet:
+        print(f"Downloading and extracting Nyarch tarball from {url}")
+    # An aria2c child can't be cancelled cleanly, so prefetch always streams
+    aria2c = None if quiet else shutil.which("aria2c")
+    part_name = "NyarchLinux.tar.gz.part"
+    part_path = os.path.join(CACHE_ROOT, part_name)
+    try:
+        if aria2c and run(
+            [
+                aria2c,
+                "-q",
+                f"-x{ARIA2C_CONNECTIONS}",
+                f"-s{ARIA2C_CONNECTIONS}",
+                "--allow-overwrite=true",
+                "-d",
+                CACHE_ROOT,
+                "-o",
+                part_name,
+                url,
+            ]
+        ) == 0:
+            with tarfile.open(part_path, mode="r|gz", bufsize=TAR_BUFSIZE) as tar:
+                tar.extractall(CACHE_ROOT, filter="data")
+        else:
+            with _urlopen(url, timeout=60) as resp:
+                # r|gz reads a short header as a clean end of archive, so a
+                # truncated body must be caught by counting bytes instead
+                reader = _CountingReader(resp)
+                with tarfile.open(
+                    fileobj=reader, mode="r|gz", bufsize=TAR_BUFSIZE
+                ) as tar:
+                    for member in tar:
+                        if _PREFETCH_CANCEL.is_set():
+                            raise InterruptedError("prefetch cancelled")
+                        tar.extract(member, CACHE_ROOT, filter="data")
+                # Drain any padding tarfile stopped short of, then compare
+                while reader.read(TAR_BUFSIZE):
+                    pass
+                _check_content_length(resp, reader.count)
+    except (OSError, tarfile.TarError, http.client.HTTPException) as exc:
+        if not quiet:
+            print(f"Failed to download/extract Nyarch tarball: {exc}")
+            print("Check your network and try again.")
+        return
+    finally:
+        for leftover in (part_path, f"{part_path}.aria2"):
+            try:
+                os.remove(leftover)
+            except OSError:
+                pass
 
-        rc = run(["tar", "-xvf", file_path], cwd=CACHE_ROOT)
-        if rc != 0:
-            print("Warning: failed to extract Nyarch tarball.")
-    else:
-        print(f"Using cached Nyarch tarball at {file_path}")
-        # Ensure extraction exists
-        if not any(
-            os.path.isdir(os.path.join(CACHE_ROOT, d))
-            for d in ("NyarchLinuxComp", "NyarchLinux")
-        ):
-            rc = run(["tar", "-xvf", file_path], cwd=CACHE_ROOT)
-            if rc != 0:
-                print("Warning: failed to extract Nyarch tarball.")
+    # Drop sentinels from older tags, then record this one
+    for name in os.listdir(CACHE_ROOT):
+        if name.startswith(".nyarch-extracted-"):
+            try:
+                os.remove(os.path.join(CACHE_ROOT, name))
+            except OSError:
+                pass
+    with open(sentinel, "w", encoding="utf-8") as f:
+        f.write(url + "\n")
+    _TARBALL_EXTRACTED = True
+
+
+_SKEL_ROOT: str | None = None
 
 
 def _get_nyarch_skel_root() -> str | None:
     """
     Return the base Nyarch skel directory under CACHE_ROOT, or None if not found.
+
+    A found directory is remembered for the rest of the run; a miss is not,
+    so a later call can still retry the download.
+
+    get_tarball() always runs first: it waits for a background prefetch to
+    finish and checks the per-tag sentinel, so a half-extracted tree (from
+    a prefetch still running, cancelled or killed) is never picked up.
     """
+    global _SKEL_ROOT
+
+    if _SKEL_ROOT is not None:
+        return _SKEL_ROOT
+
+    get_tarball()
+
     candidates = [
         os.path.join(CACHE_ROOT, "NyarchLinuxComp", "Gnome", "etc", "skel"),
         os.path.join(CACHE_ROOT, "NyarchLinux", "Gnome", "etc", "skel"),
     ]
 
-    for path in candidates:
-        if os.path.isdir(path):
-            return path
-
-    # Try extracting the tarball if nothing has been found yet
-    get_tarball()
-
-    for path in candidates:
-        if os.path.isdir(path):
-            return path
+    if _TARBALL_EXTRACTED:
+        for path in candidates:
+            if os.path.isdir(path):
+                _SKEL_ROOT = path
+                return path
 
     print(
         "Nyarch skel directory not found under cache.\n"
@@ -318,6 +923,7 @@ def _get_nyarch_skel_root() -> str | None:
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def detect_plasma_major_version() -> int:
     """
     Try to detect the KDE Plasma major version via 'plasmashell --version'.
@@ -340,63 +946,97 @@ def detect_plasma_major_version() -> int:
     return 0
 
 
+_OS_RELEASE_RE = re.compile(r"^([A-Z0-9_]+)=(.*)$", re.M)
+
+
+@functools.lru_cache(maxsize=1)
+def _os_release() -> dict[str, str]:
+    """Parsed /etc/os-release (read once per run); empty if unreadable."""
+    try:
+        text = pathlib.Path("/etc/os-release").read_text(encoding="utf-8")
+    except OSError:
+        return {}
+    return {k: v.strip().strip('"') for k, v in _OS_RELEASE_RE.findall(text)}
+
+
 def describe_os() -> str:
     """
     Best-effort human readable OS description from /etc/os-release.
     """
-    try:
-        data: dict[str, str] = {}
-        with open("/etc/os-release", "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line or "=" not in line:
-                    continue
-                k, v = line.split("=", 1)
-                data[k] = v.strip().strip('"')
-        pretty = data.get("PRETTY_NAME") or data.get("NAME") or "Unknown"
-        codename = data.get("VERSION_CODENAME") or ""
-        if codename:
-            return f"{pretty} ({codename})"
-        return pretty
-    except OSError:
+    data = _os_release()
+    if not data:
         return "Unknown"
+    pretty = data.get("PRETTY_NAME") or data.get("NAME") or "Unknown"
+    codename = data.get("VERSION_CODENAME") or ""
+    if codename:
+        return f"{pretty} ({codename})"
+    return pretty
 
 
 def install_base_dependencies() -> None:
     """
-    Install base runtime dependencies not guaranteed in a stock Debian 13 KDE setup.
+    Queue base runtime dependencies not guaranteed in a stock Debian 13 KDE
+    setup. They are installed by the single flush_apt() call in main().
     """
-    print(
-        "Installing base dependencies with apt:\n  "
-        + " ".join(BASE_DEPENDENCIES)
-    )
-    rc = apt_install(BASE_DEPENDENCIES)
-    if rc != 0:
-        print("Failed to install base dependencies. Please check apt output.")
-        sys.exit(1)
+    queue_apt(BASE_DEPENDENCIES)
 
 
 def show_banner() -> None:
-    sh(
-        "curl https://raw.githubusercontent.com/NyarchLinux/NyarchLinux/main/"
-        "Gnome/etc/skel/.config/neofetch/ascii70"
-    )
+    """
+    Print the Nyarch ASCII banner, cached under CACHE_ROOT/banner.txt and
+    refetched at most every BANNER_TTL; a failed refresh keeps the old copy.
+    """
+    banner_path = os.path.join(CACHE_ROOT, "banner.txt")
+    try:
+        age = time.time() - os.path.getmtime(banner_path)
+    except OSError:
+        age = None
+    if age is None or age > BANNER_TTL:
+        try:
+            with _urlopen(BANNER_URL, timeout=5) as resp:
+                data = resp.read()
+            with open(f"{banner_path}.tmp", "wb") as f:
+                f.write(data)
+            os.replace(f"{banner_path}.tmp", banner_path)
+        except (OSError, http.client.HTTPException):
+            pass
+    try:
+        with open(banner_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        # Offline first run: no cached copy yet
+        data = FALLBACK_BANNER.encode()
+    # Raw bytes straight to the terminal, no decode/re-encode round trip
+    sys.stdout.flush()
+    sys.stdout.buffer.write(data)
+    sys.stdout.buffer.flush()
     print(f"{RED}\n\nWelcome to Nyarch Linux KDE customization installer! {NC}")
 
 
-def _plasmoid_paths() -> list[str]:
+@functools.lru_cache(maxsize=1)
+def _plasmoid_paths() -> tuple[str, ...]:
     """Possible install locations for the KDE Material You Colors plasmoid."""
-    return [
-        os.path.join(REAL_HOME, ".local", "share", "plasma", "plasmoids", PLASMOID_ID),
+    return (
+        os.path.join(LOCAL_SHARE, "plasma", "plasmoids", PLASMOID_ID),
         os.path.join("/usr", "share", "plasma", "plasmoids", PLASMOID_ID),
-    ]
+    )
 
 
+@functools.lru_cache(maxsize=1)
 def is_kde_material_you_plasmoid_installed() -> bool:
-    """Return True if the KDE Material You Colors plasmoid appears to be installed."""
+    """
+    Return True if the KDE Material You Colors plasmoid appears to be installed.
+
+    Cached per run; call _invalidate_plasmoid_cache() after (un)installing.
+    """
     return any(os.path.isdir(p) for p in _plasmoid_paths())
 
 
+def _invalidate_plasmoid_cache() -> None:
+    """Forget the cached plasmoid install state."""
+    is_kde_material_you_plasmoid_installed.cache_clear()
+
+
 def _print_manual_plasmoid_instructions() -> None:
     """
     Fallback instructions if automatic plasmoid install fails.
@@ -411,6 +1051,62 @@ def _print_manual_plasmoid_instructions() -> None:
     )
 
 
+def _update_plasmoid_checkout(repo_dir: str) -> bool:
+    """
+    Bring the cached kde-material-you-colors checkout up to date.
+
+    An existing healthy checkout gets a shallow fetch + hard reset; only a
+    missing or broken one is removed and shallow-cloned from scratch.
+    """
+    # Symlink safety: never rmtree a symlink target
+    if os.path.islink(repo_dir):
+        print(
+            f"Refusing to operate on symlinked plasmoid dir: {repo_dir}. "
+            "Please remove it manually."
+        )
+        return False
+
+    healthy = os.path.isdir(os.path.join(repo_dir, ".git")) and (
+        subprocess.run(
+            ["git", "-C", repo_dir, "rev-parse", "--verify", "--quiet", "HEAD"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        ).returncode
+        == 0
+    )
+    if healthy:
+        if (
+            run(["git", "-C", repo_dir, "fetch", "-q", "--depth", "1", "origin", "HEAD"])
+            == 0
+            and run(["git", "-C", repo_dir, "reset", "-q", "--hard", "FETCH_HEAD"]) == 0
+        ):
+            return True
+        print("Failed to update existing plasmoid checkout; re-cloning.")
+
+    if os.path.exists(repo_dir):
+        try:
+            shutil.rmtree(repo_dir)
+        except OSError as exc:
+            print(f"Failed to remove existing plasmoid directory {repo_dir}: {exc}")
+            return False
+
+    if run(
+        [
+            "git",
+            "clone",
+            "-q",
+            "--depth=1",
+            "--filter=blob:none",
+            "--single-branch",
+            REPO_URL,
+            repo_dir,
+        ]
+    ) != 0:
+        print("Failed to clone kde-material-you-colors repository.")
+        return False
+    return True
+
+
 def _install_plasmoid_impl(*, skip_if_present: bool) -> bool:
     """
     Shared installer for the KDE Material You Colors plasmoid.
@@ -419,29 +1115,14 @@ def _install_plasmoid_impl(*, skip_if_present: bool) -> bool:
         print("KDE Material You Colors plasmoid already installed – skipping.")
         return True
 
-    rc = apt_install(["git", "kpackagetool6"])
+    rc = ensure_apt(PLASMOID_APT_DEPS)
     if rc != 0:
         print("Failed to install git/kpackagetool6 via apt.")
         _print_manual_plasmoid_instructions()
         return False
 
     repo_dir = os.path.join(CACHE_ROOT, "kde-material-you-colors")
-    if os.path.exists(repo_dir):
-        # Symlink safety: never rmtree a symlink target
-        if os.path.islink(repo_dir):
-            print(
-                f"Refusing to operate on symlinked plasmoid dir: {repo_dir}. "
-                "Please remove it manually."
-            )
-            return False
-        try:
-            shutil.rmtree(repo_dir)
-        except OSError as exc:
-            print(f"Failed to remove existing plasmoid directory {repo_dir}: {exc}")
-            return False
-
-    if run(["git", "clone", REPO_URL, repo_dir]) != 0:
-        print("Failed to clone kde-material-you-colors repository.")
+    if not _update_plasmoid_checkout(repo_dir):
         _print_manual_plasmoid_instructions()
         return False
 
@@ -451,16 +1132,15 @@ def _install_plasmoid_impl(*, skip_if_present: bool) -> bool:
         _print_manual_plasmoid_instructions()
         return False
 
-    cmd = f'kpackagetool6 --type Plasma/Applet --install "{package_dir}"'
-    rc = sh(cmd)
+    rc = run(["kpackagetool6", "--type", "Plasma/Applet", "--install", package_dir])
     if rc != 0:
-        cmd_up = f'kpackagetool6 --type Plasma/Applet --upgrade "{package_dir}"'
-        rc = sh(cmd_up)
+        rc = run(["kpackagetool6", "--type", "Plasma/Applet", "--upgrade", package_dir])
         if rc != 0:
             print("kpackagetool6 could not install/upgrade the plasmoid package.")
             _print_manual_plasmoid_instructions()
             return False
 
+    _invalidate_plasmoid_cache()
     print("KDE Material You Colors plasmoid installed/upgraded.")
     return True
 
@@ -487,19 +1167,17 @@ def install_nyarch_wallpapers() -> None:
         print(f"Backgrounds folder not found in Nyarch skel: {src_dir}")
         return
 
-    dest_dir = os.path.join(REAL_HOME, ".local", "share", "wallpapers", "nyarch")
+    dest_dir = os.path.join(LOCAL_SHARE, "wallpapers", "nyarch")
     os.makedirs(dest_dir, exist_ok=True)
 
     exts = (".jpg", ".jpeg", ".png", ".webp")
-    copied = 0
-
-    for name in os.listdir(src_dir):
-        lower = name.lower()
-        if lower.endswith(exts):
-            src_path = os.path.join(src_dir, name)
-            if os.path.isfile(src_path):
-                shutil.copy2(src_path, dest_dir)
-                copied += 1
+    with os.scandir(src_dir) as it:
+        jobs = [
+            (entry.path, os.path.join(dest_dir, entry.name))
+            for entry in it
+            if entry.name.lower().endswith(exts) and entry.is_file()
+        ]
+    copied = _copy_files_parallel(jobs)
 
     print(f"Wallpapers installed into {dest_dir} (copied {copied} images)")
 
@@ -520,17 +1198,47 @@ def install_nyarch_icon_theme() -> None:
         print(f"Icons folder not found in Nyarch skel: {src_dir}")
         return
 
-    dest_dir = os.path.join(
-        REAL_HOME, ".local", "share", "icons", "Tela-circle-MaterialYou"
-    )
+    dest_dir = os.path.join(LOCAL_SHARE, "icons", "Tela-circle-MaterialYou")
     copy_tree_skip_missing(src_dir, dest_dir)
 
     print(f"Icons installed into {dest_dir}")
 
 
+def _link_or_copy(src_root: str, dest_root: str, prefer_symlink: bool = True) -> None:
+    """
+    Populate dest_root with the top-level entries of src_root.
+
+    With prefer_symlink, each entry becomes a symlink into the (persistent)
+    cache, so no bytes are copied; entries that already exist in dest_root
+    are left alone. Otherwise entries are copied, replacing any symlinks a
+    previous symlink-mode run left behind (copying through them would write
+    each cached file onto itself).
+    """
+    os.makedirs(dest_root, exist_ok=True)
+    with os.scandir(src_root) as it:
+        for entry in it:
+            dest_entry = os.path.join(dest_root, entry.name)
+            if prefer_symlink:
+                try:
+                    os.symlink(entry.path, dest_entry)
+                except FileExistsError:
+                    pass
+                continue
+            if os.path.islink(dest_entry):
+                os.remove(dest_entry)
+            if entry.is_dir(follow_symlinks=False):
+                copy_tree_skip_missing(entry.path, dest_entry)
+            elif entry.is_file():
+                _copy_file(entry.path, dest_entry)
+
+
 def install_gtk_themes_for_kde() -> None:
     """
     Install Nyarch GTK themes + GTK 3/4 configs for use under KDE.
+
+    Themes are symlinked from the cache unless COPY_MODE is set. GTK 3/4
+    configs are always copied: Flatpak apps read them through the
+    xdg-config overrides and can't follow links into ~/.cache.
     """
     skel_root = _get_nyarch_skel_root()
     if skel_root is None:
@@ -545,52 +1253,40 @@ def install_gtk_themes_for_kde() -> None:
     if not os.path.isdir(src_gtk3) and not os.path.isdir(src_gtk4):
         print("No gtk-3.0 / gtk-4.0 configs found in Nyarch skel.")
 
-    themes_dest = os.path.join(REAL_HOME, ".local", "share", "themes")
-    gtk3_dest = os.path.join(REAL_HOME, ".config", "gtk-3.0")
-    gtk4_dest = os.path.join(REAL_HOME, ".config", "gtk-4.0")
-
-    os.makedirs(os.path.dirname(themes_dest), exist_ok=True)
-    os.makedirs(os.path.dirname(gtk3_dest), exist_ok=True)
-
-    # 1) Copy themes
-    if os.path.isdir(src_themes):
-        if os.path.isdir(themes_dest):
-            print("Backing up existing themes to ~/.local/share/themes-backup")
-            backup_dir = os.path.join(REAL_HOME, ".local", "share", "themes-backup")
-            if not os.path.isdir(backup_dir):
-                os.rename(themes_dest, backup_dir)
-
-        print(f"Copying Nyarch GTK themes into {themes_dest} ...")
-        if os.path.isdir(themes_dest):
-            for entry in os.listdir(src_themes):
-                src_entry = os.path.join(src_themes, entry)
-                dest_entry = os.path.join(themes_dest, entry)
-                if os.path.isdir(src_entry):
-                    shutil.copytree(src_entry, dest_entry, dirs_exist_ok=True)
-                else:
-                    shutil.copy2(src_entry, dest_entry)
-        else:
-            shutil.copytree(src_themes, themes_dest, dirs_exist_ok=True)
-
-    # 2) GTK 3 config
-    if os.path.isdir(src_gtk3):
-        if os.path.isdir(gtk3_dest):
-            print("Backing up existing gtk-3.0 to ~/.config/gtk-3.0-backup")
-            backup3 = os.path.join(REAL_HOME, ".config", "gtk-3.0-backup")
-            if not os.path.exists(backup3):
-                os.rename(gtk3_dest, backup3)
-        print(f"Copying Nyarch gtk-3.0 config into {gtk3_dest} ...")
-        shutil.copytree(src_gtk3, gtk3_dest, dirs_exist_ok=True)
-
-    # 3) GTK 4 config
-    if os.path.isdir(src_gtk4):
-        if os.path.isdir(gtk4_dest):
-            print("Backing up existing gtk-4.0 to ~/.config/gtk-4.0-backup")
-            backup4 = os.path.join(REAL_HOME, ".config", "gtk-4.0-backup")
-            if not os.path.exists(backup4):
-                os.rename(gtk4_dest, backup4)
-        print(f"Copying Nyarch gtk-4.0 config into {gtk4_dest} ...")
-        shutil.copytree(src_gtk4, gtk4_dest, dirs_exist_ok=True)
+    # (label, source, destination, backup, prefer_symlink)
+    phases = [
+        (
+            "GTK themes",
+            src_themes,
+            os.path.join(LOCAL_SHARE, "themes"),
+            os.path.join(LOCAL_SHARE, "themes-backup"),
+            not COPY_MODE,
+        ),
+        (
+            "gtk-3.0 config",
+            src_gtk3,
+            os.path.join(CONFIG_DIR, "gtk-3.0"),
+            os.path.join(CONFIG_DIR, "gtk-3.0-backup"),
+            False,
+        ),
+        (
+            "gtk-4.0 config",
+            src_gtk4,
+            os.path.join(CONFIG_DIR, "gtk-4.0"),
+            os.path.join(CONFIG_DIR, "gtk-4.0-backup"),
+            False,
+        ),
+    ]
+
+    for label, src, dest, backup, prefer_symlink in phases:
+        if not os.path.isdir(src):
+            continue
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        if os.path.isdir(dest) and not os.path.exists(backup):
+            print(f"Backing up existing {label} to {backup}")
+            os.rename(dest, backup)
+        print(f"{'Linking' if prefer_symlink else 'Copying'} Nyarch {label} into {dest} ...")
+        _link_or_copy(src, dest, prefer_symlink=prefer_symlink)
 
     print("Nyarch GTK themes and configs installed for KDE (GTK apps).")
 
@@ -610,14 +1306,20 @@ def install_nyarch_fetch_tools() -> None:
         ("nyaofetch", f"{TAG_PATH}usr/local/bin/nyaofetch"),
     ]
 
-    for name, url in urls:
-        rc = run(["sudo", "wget", "-q", "-O", name, url], cwd="/usr/bin")
-        if rc != 0:
+    # Download both scripts concurrently into the user cache (skipped when
+    # already cached for this tag), then install them with a single sudo
+    # call (avoids parallel sudo password prompts).
+    cache_dir = _ensure_cache_subdir("bin")
+    targets = [os.path.join(cache_dir, name) for name, _ in urls]
+    oks = download_cached([(url, target) for target, (_, url) in zip(targets, urls)])
+    for ok, (name, url) in zip(oks, urls):
+        if not ok:
             print(f"Failed to download {name} from {url}")
             return
 
-    run(["sudo", "chmod", "+x", "nekofetch"], cwd="/usr/bin")
-    run(["sudo", "chmod", "+x", "nyaofetch"], cwd="/usr/bin")
+    rc = run(["sudo", "install", "-m", "0755", "-t", "/usr/bin", *targets])
+    if rc != 0:
+        print("Failed to install nekofetch/nyaofetch into /usr/bin")
 
 
 def configure_fastfetch_theme() -> None:
@@ -629,7 +1331,7 @@ def configure_fastfetch_theme() -> None:
         return
 
     src_fast = os.path.join(skel_root, ".config", "fastfetch")
-    dest_fast = os.path.join(REAL_HOME, ".config", "fastfetch")
+    dest_fast = os.path.join(CONFIG_DIR, "fastfetch")
 
     if not os.path.isdir(src_fast):
         print(f"Nyarch fastfetch config not found at {src_fast}")
@@ -637,14 +1339,15 @@ def configure_fastfetch_theme() -> None:
 
     # Backup existing config, if any
     if os.path.isdir(dest_fast):
-        backups_root = os.path.join(REAL_HOME, ".config", "fastfetch-backup")
+        backups_root = os.path.join(CONFIG_DIR, "fastfetch-backup")
         os.makedirs(backups_root, exist_ok=True)
 
-        ts = datetime.now().strftime("%Y%m%d-%H%M%S")
+        ts = time.strftime("%Y%m%d-%H%M%S")
         archive_path = os.path.join(backups_root, f"fastfetch-{ts}.tar.gz")
 
         try:
-            with tarfile.open(archive_path, "w:gz") as tar:
+            # Tiny text config: fastest gzip level costs almost nothing in size
+            with tarfile.open(archive_path, "w:gz", compresslevel=1) as tar:
                 tar.add(dest_fast, arcname="fastfetch")
             shutil.rmtree(dest_fast)
             print(f"Existing fastfetch config archived to {archive_path}")
@@ -662,29 +1365,38 @@ def configure_kitty_theme() -> None:
     """
     if shutil.which("kitty") is None:
         print("kitty is not installed. Installing via apt...")
-        rc = apt_install(["kitty"])
+        rc = ensure_apt(KITTY_APT_DEPS)
         if rc != 0:
             print("Failed to install kitty via apt.")
             return
 
-    kitty_dir = os.path.join(REAL_HOME, ".config", "kitty")
-    os.makedirs(kitty_dir, exist_ok=True)
-
-    kitty_conf = os.path.join(kitty_dir, "kitty.conf")
-    if os.path.exists(kitty_conf):
-        sh("cd ~/.config/kitty && mv kitty.conf kitty-backup.conf")
-
     ensure_release_info()
     if TAG_PATH is None:
         print("TAG_PATH is not initialised; cannot configure kitty.")
         return
 
     kitty_url = f"{TAG_PATH}etc/skel/.config/kitty/kitty.conf"
-    rc = run(["wget", "-q", "-O", "kitty.conf", kitty_url], cwd=kitty_dir)
-    if rc != 0:
+    cached_conf = os.path.join(_ensure_cache_subdir("kitty"), "kitty.conf")
+    if not download_cached([(kitty_url, cached_conf)])[0]:
         print(f"Failed to download kitty.conf from {kitty_url}")
         return
 
+    kitty_dir = os.path.join(CONFIG_DIR, "kitty")
+    os.makedirs(kitty_dir, exist_ok=True)
+
+    kitty_conf = os.path.join(kitty_dir, "kitty.conf")
+    if os.path.exists(kitty_conf) and os.path.samefile(kitty_conf, cached_conf):
+        print("Kitty theme already up to date.")
+        return
+    if os.path.lexists(kitty_conf):
+        os.replace(kitty_conf, os.path.join(kitty_dir, "kitty-backup.conf"))
+
+    # Hardlink from the cache; fall back to a copy across filesystems
+    try:
+        os.link(cached_conf, kitty_conf)
+    except OSError:
+        shutil.copy2(cached_conf, kitty_conf)
+
     print("Kitty theme configured.")
 
 
@@ -696,7 +1408,7 @@ def configure_pywal_shell() -> None:
     marker = "# Nyarch KDE installer: pywal color sequences"
     snippet = (
         'if [[ -f "$HOME/.cache/wal/sequences" ]]; then\n'
-        '    (cat "$HOME/.cache/wal/sequences")\n'
+        '    cat "$HOME/.cache/wal/sequences"\n'
         'fi'
     )
 
@@ -717,53 +1429,105 @@ def configure_flatpak_gtk_overrides() -> None:
     """
     Configure Flatpak to allow GTK config access so themes apply to Flatpak apps.
     """
-    sh("sudo flatpak override --filesystem=xdg-config/gtk-3.0")
-    sh("sudo flatpak override --filesystem=xdg-config/gtk-4.0")
+    run([
+        "sudo", "flatpak", "override",
+        "--filesystem=xdg-config/gtk-3.0",
+        "--filesystem=xdg-config/gtk-4.0",
+    ])
     print("Flatpak GTK overrides configured.")
 
 
-def _download_flatpak_and_install(name: str, url: str) -> None:
+def _download_flatpaks_and_install(apps: list[tuple[str, str]]) -> None:
     """
-    Helper for downloading a .flatpak into the cache and installing it.
+    Helper for downloading .flatpak bundles into the cache and installing them.
+
+    Downloads run concurrently and each bundle is installed as soon as its
+    own download finishes, overlapping installs with the remaining
+    downloads. Installs stay serial because flatpak holds an exclusive lock
+    on the installation while it works.
     """
     cache_dir = _ensure_cache_subdir("flatpaks")
-    target = os.path.join(cache_dir, name)
 
-    # Download quietly into cache
-    rc = run(["wget", "-q", "-O", target, url])
-    if rc != 0:
-        print(f"Failed to download {name} from {url}")
-        return
+    with ThreadPoolExecutor(max_workers=MAX_PARALLEL_DOWNLOADS) as ex:
+        # Download quietly into cache
+        futures = {
+            ex.submit(http_download, url, os.path.join(cache_dir, name)): (name, url)
+            for name, url in apps
+        }
+        for done in as_completed(futures):
+            name, url = futures[done]
+            if not done.result():
+                print(f"Failed to download {name} from {url}")
+                continue
 
-    # Install from cached file (flatpak will still ask for confirmation)
-    rc = run(["flatpak", "install", target])
-    if rc != 0:
-        print(f"Flatpak install failed for {name}")
-    else:
-        print(f"{name} installed (or queued).")
+            # Install from cached file; --or-update makes re-runs update in place
+            target = os.path.join(cache_dir, name)
+            rc = run([*FLATPAK_INSTALL, "--bundle", target])
+            if rc != 0:
+                print(f"Flatpak install failed for {name}")
+            else:
+                print(f"{name} installed (or queued).")
+
+
+@functools.lru_cache(maxsize=1)
+def _installed_flatpaks() -> frozenset[str]:
+    """
+    IDs of every installed Flatpak ref, apps and runtimes alike (the GTK
+    themes are runtimes). Empty if flatpak is missing or the query fails.
+    """
+    try:
+        result = subprocess.run(
+            ["flatpak", "list", "--columns=application"],
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return frozenset()
+    if result.returncode != 0:
+        return frozenset()
+    return frozenset(result.stdout.split())
+
+
+@functools.lru_cache(maxsize=1)
+def _ensure_flathub() -> bool:
+    """
+    Make sure the flathub remote exists, adding it only if it is missing.
+    Checked at most once per run; returns False if it could not be added.
+    """
+    try:
+        result = subprocess.run(
+            ["flatpak", "remotes", "--columns=name"],
+            capture_output=True,
+            text=True,
+        )
+    except OSError:
+        return False
+    if result.returncode == 0 and "flathub" in result.stdout.split():
+        return True
+    return run([
+        "flatpak", "remote-add", "--if-not-exists", "flathub",
+        "https://flathub.org/repo/flathub.flatpakrepo",
+    ]) == 0
 
 
 def install_suggested_flatpaks() -> None:
     """
     Install suggested Nyarch Flatpaks (weebflow / general QoL apps).
     """
-    sh(
-        "flatpak remote-add --if-not-exists flathub "
-        "https://flathub.org/repo/flathub.flatpakrepo"
-    )
-
-    sh(
-        "flatpak install flathub "
-        "org.gtk.Gtk3theme.adw-gtk3 "
-        "org.gtk.Gtk3theme.adw-gtk3-dark "
-        "info.febvre.Komikku "
-        "com.github.tchx84.Flatseal "
-        "de.haeckerfelix.Shortwave "
-        "org.gnome.Lollypop "
-        "de.haeckerfelix.Fragments "
-        "com.mattjakeman.ExtensionManager "
-        "it.mijorus.gearlever"
-    )
+    # One flatpak transaction: a single metadata refresh for all refs.
+    # dict.fromkeys drops accidental duplicates while keeping list order.
+    # Refs that are already installed are skipped, so a re-run costs one
+    # cheap flatpak list instead of a metadata refresh per ref.
+    installed = _installed_flatpaks()
+    refs = [ref for ref in dict.fromkeys(FLATHUB_APPS) if ref not in installed]
+    if not refs:
+        print("Suggested Flatpaks are already installed.")
+        return
+    if not _ensure_flathub():
+        print("Could not set up the flathub remote; skipping suggested Flatpaks.")
+        return
+    run([*FLATPAK_INSTALL, "flathub", *refs])
+    _installed_flatpaks.cache_clear()
 
     print("Suggested Flatpaks installed (or queued).")
 
@@ -791,8 +1555,9 @@ def install_nyarch_exclusive_flatpaks() -> None:
         ),
     ]
 
-    for name, url in apps:
-        _download_flatpak_and_install(name, url)
+    # Bundles pull their runtimes from flathub
+    _ensure_flathub()
+    _download_flatpaks_and_install(apps)
 
     print("Nyarch weeb Flatpak bundle installed (or queued).")
 
@@ -803,16 +1568,7 @@ def install_kde_material_you_backend() -> bool:
     """
     print("Installing KDE Material You Colors backend via pipx...")
 
-    deps = [
-        "pipx",
-        "build-essential",
-        "python3-dev",
-        "pkg-config",
-        "python-dbus-dev",
-        "libglib2.0-dev",
-        "qml6-module-qt-labs-settings",
-    ]
-    rc = apt_install(deps)
+    rc = ensure_apt(MATERIAL_YOU_APT_DEPS)
     if rc != 0:
         print("Failed to install system dependencies for KDE Material You Colors.")
         return False
@@ -822,24 +1578,25 @@ def install_kde_material_you_backend() -> bool:
         print("pipx is not on PATH after install; aborting backend setup.")
         return False
 
-    def _pipx(args: str) -> int:
-        return sh(f'"{pipx_path}" {args}')
+    def _pipx(*args: str) -> int:
+        return run([pipx_path, *args])
 
     print("Installing 'kde-material-you-colors' via pipx...")
-    rc = _pipx("install kde-material-you-colors")
+    rc = _pipx("install", "kde-material-you-colors")
     if rc != 0:
         print("Failed to install 'kde-material-you-colors' via pipx.")
         print("Check pipx logs in ~/.local/state/pipx/log/ for details.")
         return False
 
-    _pipx("inject kde-material-you-colors pywal16 || true")
-    _pipx("ensurepath || true")
+    # Best effort: return codes are deliberately ignored
+    _pipx("inject", "kde-material-you-colors", "pywal16")
+    _pipx("ensurepath")
 
     ensure_local_bin_on_path()
 
     if shutil.which("kde-material-you-colors"):
-        sh("kde-material-you-colors -c || true")
-        sh("kde-material-you-colors -a || true")
+        run(["kde-material-you-colors", "-c"])
+        run(["kde-material-you-colors", "-a"])
     else:
         print(
             "Warning: 'kde-material-you-colors' not found on PATH even after pipx. "
@@ -853,21 +1610,122 @@ def install_kde_material_you_backend() -> bool:
     return True
 
 
-def run_user_customizations() -> bool:
+def _install_fetch_tools_and_theme() -> None:
+    install_nyarch_fetch_tools()
+    configure_fastfetch_theme()
+
+
+# Installable phases: name → (help, installer, apt packages, parallel_safe).
+# parallel_safe phases only touch files in $HOME (no sudo, apt or flatpak
+# locks, no prompts) and may run concurrently with each other.
+PHASES: dict[str, tuple[str, Callable[[], object], list[str], bool]] = {
+    "skel": (
+        "download/extract the Nyarch release tarball",
+        _get_nyarch_skel_root,
+        [],
+        # Only writes under CACHE_ROOT, so it overlaps with the serial chain
+        True,
+    ),
+    "wallpapers": ("install Nyarch wallpapers", install_nyarch_wallpapers, [], True),
+    "material-you": (
+        "install the KDE Material You Colors backend + plasmoid",
+        install_kde_material_you_backend,
+        MATERIAL_YOU_APT_DEPS + PLASMOID_APT_DEPS,
+        False,
+    ),
+    "icons": ("install the Nyarch icon theme", install_nyarch_icon_theme, [], True),
+    "gtk": ("install GTK themes + configs", install_gtk_themes_for_kde, [], True),
+    "pywal": ("add the Pywal hook to ~/.bashrc", configure_pywal_shell, [], True),
+    "flatpak-overrides": (
+        "[SYSTEM] let Flatpak apps read GTK configs",
+        configure_flatpak_gtk_overrides,
+        [],
+        False,
+    ),
+    "kitty": (
+        "[SYSTEM] install kitty + Nyarch kitty config",
+        configure_kitty_theme,
+        [] if shutil.which("kitty") else KITTY_APT_DEPS,
+        False,
+    ),
+    "fetch": (
+        "[SYSTEM] install Nekofetch/Nyaofetch + fastfetch config",
+        _install_fetch_tools_and_theme,
+        [],
+        False,
+    ),
+    "flatpaks": (
+        "[SYSTEM] install Nyarch suggested Flatpaks",
+        install_suggested_flatpaks,
+        [],
+        False,
+    ),
+    "nyarch-apps": (
+        "[SYSTEM] install Nyarch Apps (Catgirl / Waifu / Assistant)",
+        install_nyarch_exclusive_flatpaks,
+        [],
+        False,
+    ),
+}
+
+# phase → phases that must finish first
+PHASE_DEPS: dict[str, set[str]] = {
+    "wallpapers": {"skel"},
+    "icons": {"skel"},
+    "gtk": {"skel"},
+    "fetch": {"skel"},
+}
+
+# Phases that need the release tarball (skel itself and everything on top)
+TARBALL_PHASES = {"skel"} | {n for n, deps in PHASE_DEPS.items() if "skel" in deps}
+
+USER_PHASES = ["wallpapers", "material-you", "icons", "gtk", "pywal", "flatpak-overrides"]
+
+
+def run_phases(selected: list[str]) -> None:
     """
-    Run the full Nyarch KDE user customization pipeline in one go.
+    Run the selected phases (plus their dependencies) in dependency order.
+
+    Within each ready batch, parallel-safe phases run concurrently on a
+    thread pool alongside one serial chain for everything that takes
+    sudo/apt/flatpak locks or may prompt.
     """
-    install_nyarch_wallpapers()
-    install_kde_material_you_backend()
-    install_nyarch_icon_theme()
-    install_gtk_themes_for_kde()
-    configure_pywal_shell()
-    configure_flatpak_gtk_overrides()
-    print("Nyarch KDE user customizations applied.")
-    return True
+    needed: set[str] = set()
+    pending = list(selected)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(PHASE_DEPS.get(name, ()))
+
+    sorter = graphlib.TopologicalSorter(
+        {name: PHASE_DEPS.get(name, set()) for name in needed}
+    )
+    sorter.prepare()
 
+    def _run_batch(batch: list[str]) -> None:
+        parallel = [n for n in batch if PHASES[n][3]]
+        serial = [n for n in batch if not PHASES[n][3]]
 
-def confirm_dependencies() -> None:
+        def _serial_chain() -> None:
+            for name in serial:
+                PHASES[name][1]()
+
+        with ThreadPoolExecutor(max_workers=len(parallel) + 1) as ex:
+            futures = [ex.submit(PHASES[n][1]) for n in parallel]
+            futures.append(ex.submit(_serial_chain))
+            # Re-raise the first phase error, like a plain call would
+            for future in futures:
+                future.result()
+
+    while sorter.is_active():
+        # Keep the menu/flag order within a batch for the serial phases
+        batch = sorted(sorter.get_ready(), key=list(PHASES).index)
+        _run_batch(batch)
+        sorter.done(*batch)
+
+
+def confirm_dependencies(assume_yes: bool = False) -> None:
     os_desc = describe_os()
     plasma_major = detect_plasma_major_version()
 
@@ -886,48 +1744,104 @@ def confirm_dependencies() -> None:
         )
 
     base_str = " ".join(BASE_DEPENDENCIES)
-    response = input(
-        "\nThis script will use apt to install the following base packages:\n"
-        f"  {base_str}\n"
-        "Proceed? (Y/n): "
-    ).strip()
+    if assume_yes:
+        print(f"\nThis script will use apt to install the following base packages:\n  {base_str}")
+    else:
+        response = input(
+            "\nThis script will use apt to install the following base packages:\n"
+            f"  {base_str}\n"
+            "Proceed? (Y/n): "
+        ).strip()
 
-    if response and response.lower() not in ("y", "yes"):
-        print("Aborting at user request; no changes made.")
-        sys.exit(0)
+        if response and response.lower() not in ("y", "yes"):
+            print("Aborting at user request; no changes made.")
+            sys.exit(0)
 
     install_base_dependencies()
-    print("Base dependencies installed. Continuing...\n")
+    print("Base dependencies queued. Continuing...\n")
 
 
-def main() -> None:
-    show_banner()
-    confirm_dependencies()
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line flags."""
+    parser = argparse.ArgumentParser(
+        description="Nyarch Linux customization installer for Debian 13 + KDE Plasma 6. "
+        "Without phase flags, an interactive menu is shown.",
+    )
+    parser.add_argument(
+        "--copy-mode",
+        action="store_true",
+        help="copy GTK themes out of the cache instead of symlinking them "
+        "(use this if you clear ~/.cache)",
+    )
+    phases = parser.add_argument_group(
+        "phases", "select what to install non-interactively (implies consent)"
+    )
+    phases.add_argument("--all", action="store_true", help="run every phase")
+    phases.add_argument(
+        "--user",
+        action="store_true",
+        help="full [USER] theming bundle: " + ", ".join(USER_PHASES),
+    )
+    for name, (help_text, _, _, _) in PHASES.items():
+        if name != "skel":
+            phases.add_argument(f"--{name}", dest=name, action="store_true", help=help_text)
+
+    args = parser.parse_args(argv)
+    if args.all:
+        selected = [n for n in PHASES if n != "skel"]
+    else:
+        selected = [n for n in PHASES if n != "skel" and getattr(args, n)]
+        if args.user:
+            selected += [n for n in USER_PHASES if n not in selected]
+    args.phases = selected
 
+    if not selected and not sys.stdin.isatty():
+        parser.error("no phases selected and stdin is not a terminal; pass e.g. --all")
+    return args
+
+
+def _parse_selection(choice_str: str, n: int) -> list[int]:
+    """
+    Menu numbers in 1..n from a space-separated answer, in the order typed.
+    Duplicates, out-of-range numbers and non-numeric tokens are dropped.
+    """
+    selected: list[int] = []
+    for token in choice_str.split():
+        if token.isdigit():
+            num = int(token)
+            if 1 <= num <= n and num not in selected:
+                selected.append(num)
+    return selected
+
+
+def _menu_select_phases() -> tuple[list[str], list[str]]:
+    """
+    Interactive menu. Returns (selected phases, done messages to print).
+    """
     options = [
         (
             "[USER] Run full Nyarch KDE user theming (wallpapers, Material You backend + plasmoid, icons, GTK themes, Pywal hook, Flatpak GTK overrides)?",
-            run_user_customizations,
+            USER_PHASES,
             "Nyarch KDE user theming applied!",
         ),
         (
             "[SYSTEM] Install Kitty && Customizations: Apply Nyarch customizations to kitty terminal?",
-            configure_kitty_theme,
+            ["kitty"],
             "Kitty configured!",
         ),
         (
             "[SYSTEM] Install Nekofetch and Nyaofetch + configure fastfetch?",
-            lambda: (install_nyarch_fetch_tools(), configure_fastfetch_theme()),
+            ["fetch"],
             "Nyarch fetch tools configured!",
         ),
         (
             "[SYSTEM] Install Nyarch Suggested applications (Nyarch Flatpak apps)?",
-            install_suggested_flatpaks,
+            ["flatpaks"],
             "Nyarch Flatpak apps installed!",
         ),
         (
             "[SYSTEM] Install Nyarch Apps (Catgirl / Waifu / Assistant)?",
-            install_nyarch_exclusive_flatpaks,
+            ["nyarch-apps"],
             "Nyarch Apps installed!",
         ),
     ]
@@ -941,21 +1855,53 @@ def main() -> None:
         "Enter numbers to install, separated by spaces (e.g. '1 3 5'), or press Enter to skip: "
     ).strip()
 
-    selected: set[int] = set()
-    if choice_str:
-        for part in choice_str.split():
-            if part.isdigit():
-                num = int(part)
-                if 1 <= num <= len(options):
-                    selected.add(num)
-
-    for idx, (_, func, done_msg) in enumerate(options, start=1):
-        if idx in selected:
-            result = func()
-            if result is None:
-                result = True
-            if result and done_msg:
-                print(done_msg)
+    phases: list[str] = []
+    done_msgs: list[str] = []
+    for num in _parse_selection(choice_str, len(options)):
+        _, option_phases, done_msg = options[num - 1]
+        phases += [n for n in option_phases if n not in phases]
+        done_msgs.append(done_msg)
+    return phases, done_msgs
+
+
+def main() -> None:
+    global COPY_MODE
+
+    args = parse_args()
+    COPY_MODE = args.copy_mode
+    interactive = not args.phases
+
+    show_banner()
+    confirm_dependencies(assume_yes=not interactive)
+    # Only once the user has agreed to changes: the prefetch writes to the cache
+    if interactive or TARBALL_PHASES.intersection(args.phases):
+        _start_tarball_prefetch()
+
+    if interactive:
+        phases, done_msgs = _menu_select_phases()
+        if not TARBALL_PHASES.intersection(phases):
+            _PREFETCH_CANCEL.set()
+    else:
+        phases, done_msgs = args.phases, []
+
+    # One apt transaction for base deps + everything the selected phases need
+    for name in phases:
+        queue_apt(PHASES[name][2])
+    if flush_apt() != 0:
+        # apt is all-or-nothing: retry the base deps alone, and leave
+        # option-specific packages to each phase's own ensure_apt(), so an
+        # unavailable optional package only fails its own option
+        if ensure_apt(BASE_DEPENDENCIES) != 0:
+            print("Failed to install required packages. Please check apt output.")
+            sys.exit(1)
+        print(
+            "Warning: some option-specific packages could not be installed; "
+            "the options that need them may fail."
+        )
+
+    run_phases(phases)
+    for done_msg in done_msgs:
+        print(done_msg)
 
     print(f"{RED}You may need to restart Plasma or log out and back in to see all changes.{NC}")
 